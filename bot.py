@@ -1,66 +1,356 @@
 import os
 import re
+import io
+import json
+import base64
+import atexit
 import asyncio
+import weakref
 import smtplib
+import mimetypes
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from email.mime.base import MIMEBase
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email import encoders
+from email.message import EmailMessage, MIMEPart
 from pathlib import Path
-from typing import Optional, Union, List
-from playwright.async_api import async_playwright, Page, Frame, Locator, TimeoutError as PWTimeoutError
+from urllib.parse import urlparse
+from typing import Optional, Union, List, Set, Dict, Tuple
+from playwright.async_api import async_playwright, Playwright, BrowserContext, Page, Frame, Locator, TimeoutError as PWTimeoutError
 
 # ---- Time & paths -----------------------------------------------------------
 IST = timezone(timedelta(hours=5, minutes=30))
-TODAY = datetime.now(IST).date()
-YESTERDAY = TODAY - timedelta(days=1)
+
+# Recomputed at the start of every run so a long-lived loop never reuses a stale date
+def set_report_dates():
+    global TODAY, YESTERDAY, ISO_YDAY, DMY_YDAY, DEFAULT_FILENAME
+    TODAY = datetime.now(IST).date()
+    YESTERDAY = TODAY - timedelta(days=1)
+    ISO_YDAY = YESTERDAY.strftime("%Y-%m-%d")
+    DMY_YDAY = YESTERDAY.strftime("%d/%m/%Y")
+    DEFAULT_FILENAME = f"cash_flows_{ISO_YDAY}.xlsx"
+
+set_report_dates()
 
 DOWNLOAD_DIR = Path("downloads")
 DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 # ---- Secrets / Environment --------------------------------------------------
-USERNAME = os.getenv("WEBSITE_USER", "")
-PASSWORD = os.getenv("WEBSITE_PASS", "")
-LOGIN_URL = (os.getenv("LOGIN_URL") or
-             "https://eclientreporting.nuvamaassetservices.com/wealthspectrum/app/loginWith")
-
-# Email (optional)
-ENABLE_EMAIL = os.getenv("ENABLE_EMAIL", "false").strip().lower() == "true"
-FROM_EMAIL = (os.getenv("FROM_EMAIL") or "").strip()
-TO_EMAIL = (os.getenv("TO_EMAIL") or "").strip()
-SMTP_SERVER = (os.getenv("SMTP_SERVER") or "").strip()
-SMTP_PORT = int((os.getenv("SMTP_PORT") or "587").strip() or "587")
-SMTP_USER = (os.getenv("SMTP_USER") or "").strip()
-SMTP_PASS = (os.getenv("SMTP_PASS") or "").strip()
-
-# Report title (override via secret if needed)
-REPORT_TITLE = (os.getenv("REPORT_TITLE") or "Statement of Cash Flows").strip()
-DEFAULT_FILENAME = f"cash_flows_{YESTERDAY.isoformat()}.xlsx"
+def _env(name: str, default: str = "") -> str:
+    return (os.getenv(name) or default).strip() or default
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    username: str
+    password: str
+    login_url: str
+    reports_url: str
+    reuse_session: bool
+    auth_state_max_age_hours: float
+    # Email (optional)
+    enable_email: bool
+    from_email: str
+    to_email: str
+    smtp_server: str
+    smtp_port: int
+    smtp_user: str
+    smtp_pass: str
+    # Report title (override via secret if needed)
+    report_title: str
+    # Debug screenshots are viewport-only JPEGs unless DEBUG_FULL_PAGE=1
+    debug_full_page: bool
+    # BOT_DEBUG=1 records a Playwright trace (screenshots + DOM snapshots)
+    debug: bool
+    # Long-lived mode: set to re-run every N hours on one Playwright driver
+    loop_interval_hours: float
+    # Optional report-ready XHR (see watch_report_status)
+    report_status_url: str
+    report_status_done: str
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        login_url = _env("LOGIN_URL", "https://eclientreporting.nuvamaassetservices.com/wealthspectrum/app/loginWith")
+        return cls(
+            username=os.getenv("WEBSITE_USER", ""),
+            password=os.getenv("WEBSITE_PASS", ""),
+            login_url=login_url,
+            reports_url=_env("REPORTS_URL", login_url.rsplit("/", 1)[0] + "/reports"),
+            reuse_session=_env("REUSE_SESSION", "true").lower() == "true",
+            auth_state_max_age_hours=float(_env("AUTH_STATE_MAX_AGE_HOURS", "12")),
+            enable_email=_env("ENABLE_EMAIL", "false").lower() == "true",
+            from_email=_env("FROM_EMAIL"),
+            to_email=_env("TO_EMAIL"),
+            smtp_server=_env("SMTP_SERVER"),
+            smtp_port=int(_env("SMTP_PORT", "587")),
+            smtp_user=_env("SMTP_USER"),
+            smtp_pass=_env("SMTP_PASS"),
+            report_title=_env("REPORT_TITLE", "Statement of Cash Flows"),
+            debug_full_page=_env("DEBUG_FULL_PAGE") == "1",
+            debug=_env("BOT_DEBUG") == "1",
+            loop_interval_hours=float(_env("LOOP_INTERVAL_HOURS", "0")),
+            report_status_url=_env("REPORT_STATUS_URL"),
+            report_status_done=_env("REPORT_STATUS_DONE", "completed"),
+        )
+
+CFG = Config.from_env()
+
+# Persistent Chromium profile (HTTP cache, cookies)
+PROFILE_DIR = DOWNLOAD_DIR / ".chromium-profile"
+
+# Analytics the bot never needs; resolved to nothing by Chromium itself. (A
+# Playwright route would do it too, but any route turns on request
+# interception, which disables the profile's HTTP cache.)
+BLOCKED_HOSTS = ("google-analytics.com", "googletagmanager.com", "hotjar.com", "segment.com", "segment.io", "clarity.ms")
+
+# Playwright already passes --no-sandbox, --disable-dev-shm-usage,
+# --disable-extensions, --disable-features=... etc., and Chromium keeps only
+# the last copy of a repeated switch, so only add switches it doesn't set.
+CHROMIUM_ARGS = [
+    "--host-resolver-rules=" + ", ".join(f"MAP {p}{h} ~NOTFOUND" for h in BLOCKED_HOSTS for p in ("", "*.")),
+    "--disable-gpu", "--disable-sync",
+    # Replaces Playwright's headless --blink-settings, so repeat its
+    # hover/pointer emulation keys alongside imagesEnabled=false
+    "--blink-settings=primaryHoverType=2,availableHoverTypes=2,"
+    "primaryPointerType=4,availablePointerTypes=4,imagesEnabled=false",
+]
+
+# Saved login session (dot-file so it isn't uploaded with the artifacts)
+AUTH_STATE_PATH = DOWNLOAD_DIR / ".auth.json"
+
+# Last-working strategies per site (see load_hints)
+SELECTOR_HINTS_PATH = DOWNLOAD_DIR / ".selectors.json"
+
+# ---- Selector patterns (compiled once) --------------------------------------
+_RE_LOGIN = re.compile(r"log ?in", re.I)
+_RE_USER = re.compile("user", re.I)
+_RE_PASS = re.compile("pass|pwd", re.I)
+_RE_REPORTS = re.compile(r"\bReports\b", re.I)
+_RE_EXECUTE = re.compile(r"\b(Execute|Run|Generate|Submit|View Report|View)\b", re.I)
+_RE_REPORT_EXECUTIONS = re.compile(r"Report Executions", re.I)
+_RE_DL_WORDS = re.compile(r"download|document|file|xlsx|excel|csv|pdf", re.I)
 
 # ============================ Helpers ========================================
 def email_config_ok() -> bool:
-    if not ENABLE_EMAIL:
+    if not CFG.enable_email:
         return False
-    req = [FROM_EMAIL, TO_EMAIL, SMTP_SERVER, str(SMTP_PORT), SMTP_USER, SMTP_PASS]
-    if any(not v for v in req):
+    if not all((CFG.from_email, CFG.to_email, CFG.smtp_server, CFG.smtp_port, CFG.smtp_user, CFG.smtp_pass)):
         print("[INFO] Email not sent: ENABLE_EMAIL=true but one or more SMTP fields are blank.")
         return False
     return True
 
+# --- SMTP: one session reused across messages (and runs, in loop mode) ------
+SMTP_TIMEOUT = 30
+
+class SmtpSession:
+    # Connects lazily, NOOP-checks an idle connection before reuse, and
+    # recycles it every max_messages sends
+    def __init__(self, host: str, port: int, user: str, password: str, max_messages: int = 1000):
+        self.host, self.port, self.user, self.password = host, port, user, password
+        self.max_messages = max_messages
+        self.server: Optional[smtplib.SMTP] = None
+        self.sent = 0
+
+    def __enter__(self) -> "SmtpSession":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        # 465 is implicit TLS: no plaintext EHLO + STARTTLS round trips
+        if self.port == 465:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=SMTP_TIMEOUT)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        # Only keep the connection once authenticated; a half-set-up one would
+        # pass the NOOP check next time and send without AUTH
+        try:
+            if self.port != 465:
+                server.starttls()
+            server.login(self.user, self.password)
+        except Exception:
+            try:
+                server.quit()
+            except Exception:
+                server.close()
+            raise
+        self.server = server
+        self.sent = 0
+
+    def _alive(self) -> bool:
+        try:
+            return self.server is not None and self.server.noop()[0] == 250
+        except (smtplib.SMTPServerDisconnected, OSError):
+            return False
+
+    def send(self, msg: EmailMessage):
+        if self.sent >= self.max_messages or not self._alive():
+            self.close()
+            self._connect()
+        try:
+            self.server.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self.close()  # dropped between NOOP and send: reconnect once
+            self._connect()
+            self.server.send_message(msg)
+        self.sent += 1
+
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                pass
+            self.server = None
+
+# One live session per (server, port, user), kept until interpreter exit
+_smtp_pool: Dict[Tuple[str, int, str], SmtpSession] = {}
+
+def smtp_session() -> SmtpSession:
+    key = (CFG.smtp_server, CFG.smtp_port, CFG.smtp_user)
+    if key not in _smtp_pool:
+        _smtp_pool[key] = SmtpSession(*key, CFG.smtp_pass)
+    return _smtp_pool[key]
+
+@atexit.register
+def _close_smtp_pool():
+    for session in _smtp_pool.values():
+        session.close()
+
+def _build_message(paths: List[Path]) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = CFG.from_email
+    msg["To"] = CFG.to_email
+    msg["Subject"] = f"{CFG.report_title} – {ISO_YDAY}"
+    msg.set_content(f"Attached: {CFG.report_title} as on {DMY_YDAY}.")
+
+    if paths:
+        msg.make_mixed()
+    for p in paths:
+        msg.attach(_b64_attachment(Path(p)))
+    return msg
+
+# Base64-encode in 57-byte-aligned chunks (one 76-char line per 57 bytes) so the
+# raw file is never held in memory alongside its encoded copy
+B64_CHUNK = 57 * 1024
+
+def _b64_attachment(path: Path) -> MIMEPart:
+    buf = io.StringIO()
+    with open(path, "rb") as f:
+        while chunk := f.read(B64_CHUNK):
+            buf.write(base64.encodebytes(chunk).decode("ascii"))
+
+    part = MIMEPart()
+    part["Content-Type"] = mimetypes.guess_type(str(path))[0] or "application/octet-stream"
+    part["Content-Transfer-Encoding"] = "base64"
+    part.add_header("Content-Disposition", "attachment", filename=path.name)
+    part.set_payload(buf.getvalue())
+    return part
+
+# One email per inner list of attachments, all over the same SMTP session
+def email_files(messages: List[List[Path]]):
+    for paths in messages:
+        smtp_session().send(_build_message(paths))
+        print(f"[OK] Emailed {', '.join(Path(p).name for p in paths)} to {CFG.to_email}.")
+
+def auth_state_fresh() -> bool:
+    try:
+        age = datetime.now().timestamp() - AUTH_STATE_PATH.stat().st_mtime
+    except OSError:
+        return False
+    return age < CFG.auth_state_max_age_hours * 3600
+
+# Which strategy worked last time, per site; tried first on the next run
+def load_hints() -> dict:
+    try:
+        return json.loads(SELECTOR_HINTS_PATH.read_text()).get(urlparse(CFG.login_url).netloc, {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def save_hints(hints: dict):
+    try:
+        data = json.loads(SELECTOR_HINTS_PATH.read_text())
+        if not isinstance(data, dict):
+            data = {}
+    except (OSError, ValueError):
+        data = {}
+    data[urlparse(CFG.login_url).netloc] = hints
+    try:
+        SELECTOR_HINTS_PATH.write_text(json.dumps(data, indent=2))
+    except OSError as e:
+        print(f"[DEBUG] Failed to save selector hints: {e}")
+
+def hinted_order(names: List[str], hints: Optional[dict], key: str) -> List[str]:
+    preferred = (hints or {}).get(key)
+    return sorted(names, key=lambda n: n != preferred)
+
 async def safe_screenshot(ctx: Union[Page, Frame], name: str):
     try:
         page = ctx if isinstance(ctx, Page) else ctx.page
-        path = DOWNLOAD_DIR / name
-        await page.screenshot(path=str(path), full_page=True)
+        path = (DOWNLOAD_DIR / name).with_suffix(".jpg")
+        await page.screenshot(path=str(path), type="jpeg", quality=70, full_page=CFG.debug_full_page)
         print(f"[DEBUG] Saved screenshot: {path}")
     except Exception as e:
         print(f"[DEBUG] Failed to capture screenshot: {e}")
 
+# Failure-path screenshots run in the background so the error surfaces
+# immediately; flush_screenshots() gives them a bounded grace period before
+# the browser is torn down.
+_pending_shots: Set[asyncio.Task] = set()
+
+def screenshot_later(ctx: Union[Page, Frame], name: str) -> asyncio.Task:
+    task = asyncio.create_task(safe_screenshot(ctx, name))
+    _pending_shots.add(task)
+    task.add_done_callback(_pending_shots.discard)
+    return task
+
+async def flush_screenshots(timeout: float = 3.0):
+    if not _pending_shots:
+        return
+    _, pending = await asyncio.wait(set(_pending_shots), timeout=timeout)
+    for t in pending:
+        t.cancel()
+
+# Wrap a step: on any exception, capture debug_<name> in the background and re-raise
+@asynccontextmanager
+async def step(ctx: Union[Page, Frame], name: str):
+    try:
+        yield
+    except Exception:
+        screenshot_later(ctx, f"debug_{name}.jpg")
+        raise
+
+# Page plus child frames from the app's own site; third-party iframes
+# (analytics, chat widgets) never host the report form. Memoized per page and
+# dropped whenever a frame navigates, attaches or detaches.
+_contexts_cache: "weakref.WeakKeyDictionary[Page, List[Union[Page, Frame]]]" = weakref.WeakKeyDictionary()
+_contexts_watched: "weakref.WeakSet[Page]" = weakref.WeakSet()
+
 def contexts(page: Page) -> List[Union[Page, Frame]]:
-    return [page, *page.frames]
+    cached = _contexts_cache.get(page)
+    if cached is not None:
+        return cached
+    if page not in _contexts_watched:
+        for event in ("framenavigated", "frameattached", "framedetached"):
+            page.on(event, lambda _f: _contexts_cache.pop(page, None))
+        _contexts_watched.add(page)
+
+    site = ".".join((urlparse(page.url).hostname or "").split(".")[-2:])
+    ctxs = [page] + [
+        f for f in page.frames
+        if f is not page.main_frame and (urlparse(f.url).hostname or "").endswith(site)
+    ]
+    _contexts_cache[page] = ctxs
+    return ctxs
 
 async def try_click(locator: Locator, timeout: int = 1500) -> bool:
+    # click() already auto-scrolls; only scroll explicitly if that failed
+    try:
+        await locator.first.click(timeout=timeout)
+        return True
+    except PWTimeoutError:
+        return False  # never became actionable; a retry would just wait again
+    except Exception:
+        pass
     try:
         await locator.first.scroll_into_view_if_needed(timeout=timeout)
         await locator.first.click(timeout=timeout)
@@ -68,28 +358,114 @@ async def try_click(locator: Locator, timeout: int = 1500) -> bool:
     except Exception:
         return False
 
+# --- Already logged in? (sidebar only renders for an authenticated session) --
+async def is_logged_in(page: Page, timeout: int = 3000) -> bool:
+    try:
+        await page.locator("#reportLeftMenu").wait_for(state="visible", timeout=timeout)
+        return True
+    except Exception:
+        return False
+
 # --- Left sidebar "Reports" (3rd from top) ----------------------------------
 async def click_reports_nav(page: Page):
     sidebar = page.locator("#reportLeftMenu")
     try:
         await sidebar.wait_for(state="visible", timeout=8000)
-        link = sidebar.get_by_role("link", name=re.compile(r"\bReports\b", re.I))
+        link = sidebar.locator("a").filter(has_text=_RE_REPORTS)
         if await link.count() > 0 and await try_click(link, 3000):
             return
-        links = sidebar.get_by_role("link")
+        links = sidebar.locator("a[href]")
         if await links.count() >= 3 and await try_click(links.nth(2), 3000):
             return
     except Exception:
         pass
     if await try_click(page.locator("#reportLeftMenu a[href*='/app/reports']"), 3000):
         return
-    if await try_click(page.get_by_role("link", name=re.compile(r"\bReports\b", re.I)), 3000):
+    if await try_click(page.locator("a").filter(has_text=_RE_REPORTS), 3000):
         return
-    await page.get_by_text("Reports", exact=False).first.click()
+    await page.locator("a:has-text('Reports'), button:has-text('Reports'), [role='link']:has-text('Reports')").first.click()
+
+# --- Wait for the report form (page or any frame) instead of networkidle ----
+# Probe the form's own controls: the control after the "Report" label or the
+# "As on Date" input. Never bare "Report" text, which the sidebar always has.
+XPATH_REPORT_CONTROL = (
+    "xpath=//label[contains(., 'Report')]"
+    "/following::*[self::select or self::input or @role='combobox'][1]"
+)
+
+async def wait_for_report_form(page: Page, timeout: int = 10_000) -> bool:
+    # Page and frames probed at once, each with the full timeout
+    async def visible(c: Union[Page, Frame]) -> bool:
+        try:
+            await c.locator(XPATH_REPORT_CONTROL).or_(c.locator(XPATH_AS_ON_DATE_INPUT)).first.wait_for(
+                state="visible", timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    return bool(await first_success([lambda c=c: visible(c) for c in contexts(page)], stagger=0))
+
+# --- Open Reports: direct URL first, sidebar click as fallback --------------
+async def open_reports(page: Page):
+    try:
+        if page.url.rstrip("/") != CFG.reports_url.rstrip("/"):
+            resp = await page.goto(CFG.reports_url, wait_until="domcontentloaded")
+            if resp is not None and not resp.ok:
+                raise RuntimeError(f"HTTP {resp.status}")
+        if await wait_for_report_form(page, 5000):
+            print("[DEBUG] Opened Reports via direct URL.")
+            return
+    except Exception as e:
+        print(f"[DEBUG] Direct Reports URL failed ({e}); using sidebar.")
+    await click_reports_nav(page)
+    if not await wait_for_report_form(page):
+        print("[WARN] Report form not detected; continuing anyway.")
+
+# --- Race fallback strategies; first one to succeed wins --------------------
+# The i-th strategy starts after i*stagger seconds so preferred ones get a head
+# start; returns the first truthy result (or None) and cancels the rest.
+async def first_success(strategies: List, stagger: float = 1.0, timeout: Optional[float] = None):
+    async def staggered(i, strat):
+        if i and stagger:
+            await asyncio.sleep(i * stagger)
+        return await strat()
+
+    tasks = [asyncio.create_task(staggered(i, s)) for i, s in enumerate(strategies)]
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for t in tasks:  # keep preference order among simultaneous finishers
+                if t in done and not t.cancelled() and t.exception() is None and t.result():
+                    return t.result()
+        return None
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 # --- Report dropdown selection -----------------------------------------------
-async def select_report(ctx: Union[Page, Frame], option_text: str, timeout_ms: int = 9000) -> bool:
-    # 1) Native <select> near label
+REPORT_PANELS = [
+    "[role='listbox']",
+    ".mat-select-panel",
+    ".cdk-overlay-pane",
+    ".ng-dropdown-panel",
+    ".ant-select-dropdown",
+    ".p-dropdown-items-wrapper",
+    ".dropdown-menu",
+    "ul[role='listbox']",
+    "ul[role='menu']",
+]
+# Any list at all: only tried once no real panel had the option
+REPORT_PANEL_FALLBACK = "ul"
+
+# 1) Native <select> near label
+async def _strat_native_select(ctx: Union[Page, Frame], option_text: str, timeout_ms: int) -> bool:
     try:
         label = ctx.get_by_text("Report", exact=False).first
         sel = ctx.locator("select").filter(has=label)
@@ -102,43 +478,41 @@ async def select_report(ctx: Union[Page, Frame], option_text: str, timeout_ms: i
             return True
     except Exception:
         pass
+    return False
 
-    # 2) Custom dropdowns
+# 2) Custom dropdowns
+async def _strat_custom_panel(ctx: Union[Page, Frame], option_text: str, timeout_ms: int) -> bool:
+    triggers = [
+        ctx.locator("xpath=//label[contains(., 'Report')]/following::*[self::div or self::button or self::span or self::input][1]"),
+        ctx.get_by_role("combobox"),
+    ]
+    counts = await asyncio.gather(*(t.count() for t in triggers), return_exceptions=True)
     opened = False
-    try:
-        box = ctx.locator("xpath=//label[contains(., 'Report')]/following::*[self::div or self::button or self::span or self::input][1]")
-        opened = await try_click(box, 2000)
-    except Exception:
-        pass
+    for t, n in zip(triggers, counts):
+        if isinstance(n, int) and n and await try_click(t, 2000):
+            opened = True
+            break
     if not opened:
-        opened = await try_click(ctx.get_by_role("combobox"), 2000)
-
-    if opened:
-        panels = [
-            "[role='listbox']",
-            ".mat-select-panel",
-            ".cdk-overlay-pane",
-            ".ng-dropdown-panel",
-            ".ant-select-dropdown",
-            ".p-dropdown-items-wrapper",
-            ".dropdown-menu",
-            "ul[role='listbox']",
-            "ul[role='menu']",
-            "ul",
-        ]
-        for pc in panels:
-            try:
-                cont = ctx.locator(pc)
-                if await cont.count() == 0:
-                    continue
-                opt = cont.locator("*", has_text=re.compile(re.escape(option_text), re.I)).first
-                await opt.click(timeout=timeout_ms)
-                print(f"[DEBUG] Selected report via panel '{pc}'.")
-                return True
-            except Exception:
-                continue
+        return False
 
-    # 3) Type-to-select fallback
+    # Real panels first (one union), then any visible list. get_by_text is a
+    # plain substring match that already resolves to the innermost element
+    # carrying the text, so a whole panel/overlay is never clicked in its
+    # middle; visible-only so a collapsed sidebar menu can't win
+    tiers = [(", ".join(REPORT_PANELS), min(timeout_ms, 3000)), (REPORT_PANEL_FALLBACK, 1000)]
+    for panels, click_timeout in tiers:
+        opt = ctx.locator(panels).get_by_text(option_text, exact=False).filter(visible=True).first
+        try:
+            # The panel was just opened by our click, so it renders (or not) quickly
+            await opt.click(timeout=click_timeout)
+            print("[DEBUG] Selected report via dropdown panel.")
+            return True
+        except Exception:
+            pass
+    return False
+
+# 3) Type-to-select fallback
+async def _strat_typing(ctx: Union[Page, Frame], option_text: str, timeout_ms: int) -> bool:
     try:
         rs_input = ctx.locator("div[role='combobox'] input, input[role='combobox'], input[aria-autocomplete='list']")
         if await rs_input.count() == 0:
@@ -151,8 +525,10 @@ async def select_report(ctx: Union[Page, Frame], option_text: str, timeout_ms: i
             return True
     except Exception:
         pass
+    return False
 
-    # 4) Last resort: click visible text
+# 4) Last resort: click visible text
+async def _strat_text_click(ctx: Union[Page, Frame], option_text: str, timeout_ms: int) -> bool:
     try:
         await ctx.get_by_text(option_text, exact=False).first.click(timeout=timeout_ms)
         print("[DEBUG] Selected report via generic text click.")
@@ -160,65 +536,120 @@ async def select_report(ctx: Union[Page, Frame], option_text: str, timeout_ms: i
     except Exception:
         return False
 
-# --- Force-set an input value with native setter + events --------------------
-async def set_input_value_with_events(input_locator: Locator, value: str):
-    await input_locator.evaluate(
-        """(el, val) => {
+REPORT_STRATEGIES = {
+    "native_select": _strat_native_select,
+    "custom_panel": _strat_custom_panel,
+    "typing": _strat_typing,
+    "text_click": _strat_text_click,
+}
+# Only these two confirm their own selection, so only they are raced; the
+# blind fallbacks would close an open panel and claim success
+RACED_REPORT_STRATEGIES = ("native_select", "custom_panel")
+
+async def select_report(ctx: Union[Page, Frame], option_text: str, timeout_ms: int = 9000,
+                        hints: Optional[dict] = None, fallbacks: bool = True) -> bool:
+    # fallbacks=False: verified strategies only, for callers racing several
+    # frames that run the blind ones themselves once every frame has failed
+    async def attempt(name: str) -> Optional[str]:
+        return name if await REPORT_STRATEGIES[name](ctx, option_text, timeout_ms) else None
+
+    raced = hinted_order(list(RACED_REPORT_STRATEGIES), hints, "report_strategy")
+    won = await first_success(
+        [lambda n=n: attempt(n) for n in raced],
+        timeout=timeout_ms / 1000 + len(raced),
+    )
+    if won and hints is not None:
+        hints["report_strategy"] = won
+    if not won and fallbacks:
+        return await select_report_fallback(ctx, option_text, timeout_ms, hints)
+    return bool(won)
+
+# Blind strategies, one after another; only once the verified ones have failed
+async def select_report_fallback(ctx: Union[Page, Frame], option_text: str, timeout_ms: int = 9000,
+                                 hints: Optional[dict] = None) -> bool:
+    for name in REPORT_STRATEGIES:
+        if name not in RACED_REPORT_STRATEGIES and await REPORT_STRATEGIES[name](ctx, option_text, timeout_ms):
+            if hints is not None:
+                hints["report_strategy"] = name
+            return True
+    return False
+
+# --- Set a date input in one round trip: native setter + events -----------
+# Uses ISO for <input type=date>, dd/mm/YYYY otherwise; reports whether it stuck
+async def set_date_with_events(input_locator: Locator, iso: str, dmy_slash: str) -> dict:
+    return await input_locator.evaluate(
+        """(el, [iso, dmy]) => {
+            const val = (el.type || '').toLowerCase() === 'date' ? iso : dmy;
             const proto = window.HTMLInputElement.prototype;
             const desc = Object.getOwnPropertyDescriptor(proto, 'value');
             desc.set.call(el, val);
             el.dispatchEvent(new Event('input', { bubbles: true }));
             el.dispatchEvent(new Event('change', { bubbles: true }));
             el.blur();
+            return { ok: el.value === val, newValue: el.value };
         }""",
-        value,
+        [iso, dmy_slash],
     )
 
 # --- Set "As on Date" to yesterday ------------------------------------------
-async def set_as_on_date(ctx: Union[Page, Frame], dt: datetime.date):
-    iso = dt.strftime("%Y-%m-%d")
-    dmy_slash = dt.strftime("%d/%m/%Y")
-
-    # Target the input next to the "As on Date" label (common case)
-    inp = ctx.locator("xpath=//label[contains(., 'As on Date')]/following::input[1]")
+# First input after the "As on Date" caption, whether it's a <label> or a plain
+# span/div, resolved in a single XPath evaluation.
+XPATH_AS_ON_DATE_INPUT = (
+    "xpath=(//label[contains(., 'As on Date')]"
+    " | //*[not(self::script) and not(self::label)][contains(normalize-space(text()), 'As on Date')]"
+    ")[1]/following::input[1]"
+)
+
+# A/B/C) JS-set, type or fill the labelled input (one strategy: they all act on
+# the same element, so they stay sequential)
+async def _date_via_input(ctx: Union[Page, Frame], iso: str, dmy_slash: str) -> bool:
+    inp = ctx.locator(XPATH_AS_ON_DATE_INPUT)
     try:
         await inp.first.wait_for(state="visible", timeout=4000)
+    except Exception:
+        return False  # couldn't find that labeled input
 
-        # A) type dd/mm/YYYY
-        try:
-            await inp.first.click()
-            await inp.first.press("Control+A")
-            await inp.first.type(dmy_slash)
-            await inp.first.press("Tab")
-            print("[DEBUG] Date set via typing (dd/mm/YYYY).")
-            return
-        except Exception:
-            pass
-
-        # B) fill ISO then blur
-        try:
-            await inp.first.fill(iso)
-            await inp.first.press("Tab")
-            print("[DEBUG] Date set via fill (YYYY-mm-dd).")
-            return
-        except Exception:
-            pass
+    # Widget often defaults to yesterday already; don't touch it then
+    try:
+        if await inp.first.input_value() in (dmy_slash, iso):
+            print("[DEBUG] Date already set; leaving input untouched.")
+            return True
+    except Exception:
+        pass
 
-        # C) native setter + events
-        try:
-            await set_input_value_with_events(inp.first, dmy_slash)
-            print("[DEBUG] Date set via JS setter + events.")
-            return
-        except Exception:
-            pass
+    # A) native setter + events, single evaluate (picks ISO for type=date)
+    try:
+        res = await set_date_with_events(inp.first, iso, dmy_slash)
+        if res.get("ok"):
+            print(f"[DEBUG] Date set via JS setter + events ({res.get('newValue')}).")
+            return True
+    except Exception:
+        pass
 
+    # B) type dd/mm/YYYY
+    try:
+        await inp.first.click()
+        await inp.first.press("Control+A")
+        await inp.first.type(dmy_slash)
+        await inp.first.press("Tab")
+        print("[DEBUG] Date set via typing (dd/mm/YYYY).")
+        return True
     except Exception:
-        # couldn't find that labeled input; fall through
         pass
 
-    # D) open datepicker and pick the day
+    # C) fill ISO then blur
+    try:
+        await inp.first.fill(iso)
+        await inp.first.press("Tab")
+        print("[DEBUG] Date set via fill (YYYY-mm-dd).")
+        return True
+    except Exception:
+        return False
+
+# D) open datepicker and pick the day
+async def _date_via_picker(ctx: Union[Page, Frame], dt: datetime.date) -> bool:
     toggles = [
-        "xpath=//label[contains(., 'As on Date')]/following::*[contains(@class,'datepicker') or contains(@aria-label,'calendar') or self::button][1]",
+        "xpath=//label[contains(., 'As on Date')]/following::*[contains(@class,'datepicker') or contains(@aria-label,'calendar')][1]",
         ".mat-datepicker-toggle",
         "button[aria-label*='calendar']",
         ".p-datepicker-trigger",
@@ -228,38 +659,78 @@ async def set_as_on_date(ctx: Union[Page, Frame], dt: datetime.date):
         if await try_click(ctx.locator(t), 1500):
             opened = True
             break
+    if not opened:
+        return False
 
-    if opened:
-        labels = [
-            dt.strftime("%-d %B %Y"),  # Linux: 24 August 2025
-            dt.strftime("%d %B %Y"),   # zero-padded day
-            dt.strftime("%-d %b %Y"),  # 24 Aug 2025
-            dt.strftime("%d %b %Y"),   # padded
-        ]
-        for lab in labels:
-            try:
-                await ctx.locator(f"[aria-label='{lab}']").first.click(timeout=1200)
-                print(f"[DEBUG] Date picked via datepicker aria-label '{lab}'.")
-                return
-            except Exception:
-                continue
-        # generic day cell
-        try:
-            cal = ctx.locator(".mat-calendar, .p-datepicker-calendar, .ui-datepicker-calendar, .cdk-overlay-pane")
-            if await cal.count() > 0:
-                await cal.first.get_by_text(str(dt.day), exact=True).first.click(timeout=1200)
-                print("[DEBUG] Date picked via datepicker day cell.")
-                return
-        except Exception:
-            pass
-
-    print("[WARN] Could not set date; using site's default.")
+    labels = [
+        dt.strftime("%-d %B %Y"),  # Linux: 24 August 2025
+        dt.strftime("%d %B %Y"),   # zero-padded day
+        dt.strftime("%-d %b %Y"),  # 24 Aug 2025
+        dt.strftime("%d %b %Y"),   # padded
+    ]
+    try:
+        sel = ", ".join(f"[aria-label={json.dumps(lab)}]" for lab in dict.fromkeys(labels))
+        await ctx.locator(sel).first.click(timeout=2000)
+        print("[DEBUG] Date picked via datepicker aria-label.")
+        return True
+    except Exception:
+        pass
+    # generic day cell
+    try:
+        cal = ctx.locator(".mat-calendar, .p-datepicker-calendar, .ui-datepicker-calendar, .cdk-overlay-pane")
+        if await cal.count() > 0:
+            await cal.first.get_by_text(str(dt.day), exact=True).first.click(timeout=1200)
+            print("[DEBUG] Date picked via datepicker day cell.")
+            return True
+    except Exception:
+        pass
+    # Close the calendar we opened so its backdrop doesn't swallow later clicks
+    try:
+        page = ctx if isinstance(ctx, Page) else ctx.page
+        await page.keyboard.press("Escape")
+    except Exception:
+        pass
+    return False
+
+async def set_as_on_date(ctx: Union[Page, Frame], dt: datetime.date, hints: Optional[dict] = None):
+    if dt == YESTERDAY:
+        iso, dmy_slash = ISO_YDAY, DMY_YDAY
+    else:
+        iso, dmy_slash = dt.strftime("%Y-%m-%d"), dt.strftime("%d/%m/%Y")
+
+    strategies = {
+        "input": lambda: _date_via_input(ctx, iso, dmy_slash),
+        "picker": lambda: _date_via_picker(ctx, dt),
+    }
+
+    # Sequential, not raced: both act on the same widget, and a picker
+    # cancelled mid-way would leave its overlay open over Execute
+    won = None
+    for name in hinted_order(list(strategies), hints, "date_strategy"):
+        if await strategies[name]():
+            won = name
+            break
+    if not won:
+        print("[WARN] Could not set date; using site's default.")
+    elif hints is not None:
+        hints["date_strategy"] = won
 
 # --- Click Execute robustly --------------------------------------------------
-async def click_execute(ctx: Union[Page, Frame]):
+EXECUTE_INPUTS = (
+    "input[type='submit'][value*='Execute' i], input[type='button'][value*='Execute' i], "
+    "input[type='submit'][value*='Generate' i], input[type='button'][value*='Generate' i]"
+)
+
+async def click_execute(ctx: Union[Page, Frame], hints: Optional[dict] = None):
+    any_text = ctx.locator("button, a, input[type='submit'], [role='button']").filter(has_text=_RE_EXECUTE)
+
+    # Last run only worked via the text fallback: try that first, briefly
+    if hints and hints.get("execute") == "text" and await try_click(any_text, 1000):
+        print("[DEBUG] Clicked Execute via text fallback (cached).")
+        return
+
     # Prefer a real <button> Execute, else JS-click
-    labels = r"\b(Execute|Run|Generate|Submit|View Report|View)\b"
-    btn = ctx.get_by_role("button", name=re.compile(labels, re.I)).first
+    btn = ctx.locator("button").filter(has_text=_RE_EXECUTE).or_(ctx.locator(EXECUTE_INPUTS)).first
     try:
         await btn.wait_for(state="visible", timeout=6000)
         # Try to ensure enabled
@@ -272,51 +743,271 @@ async def click_execute(ctx: Union[Page, Frame]):
         except Exception:
             await btn.evaluate("el => el.click()")
         print("[DEBUG] Clicked Execute.")
+        if hints is not None:
+            hints["execute"] = "button"
         return
     except Exception:
         pass
 
     # Text fallback anywhere
-    any_text = ctx.get_by_text(re.compile(labels, re.I))
     if await try_click(any_text, 5000):
         print("[DEBUG] Clicked Execute via text fallback.")
+        if hints is not None:
+            hints["execute"] = "text"
         return
 
-    await safe_screenshot(ctx, "debug_execute_click_failed.png")
-    raise RuntimeError("Could not click Execute.")
+    async with step(ctx, "execute_click_failed"):
+        raise RuntimeError("Could not click Execute.")
 
 # --- Switch to 'Report Executions' tab --------------------------------------
 async def open_report_executions(ctx: Union[Page, Frame]):
     # Tabs may be role="tab" or plain links
-    if await try_click(ctx.get_by_role("tab", name=re.compile(r"Report Executions", re.I)), 3000):
+    if await try_click(ctx.get_by_role("tab", name=_RE_REPORT_EXECUTIONS), 3000):
         return
-    if await try_click(ctx.get_by_text("Report Executions", exact=False), 3000):
+    # get_by_text resolves to the innermost element, never a wrapper around
+    # the whole tab strip that would be clicked in its middle
+    if await try_click(ctx.get_by_text(_RE_REPORT_EXECUTIONS), 3000):
         return
 
-# --- Find the download button for our report --------------------------------
-async def find_download_button(ctx: Union[Page, Frame], title: str) -> Optional[Locator]:
-    row = ctx.get_by_role("row").filter(has=ctx.get_by_text(title, exact=False)).first
-    candidates = [
-        row.get_by_role("button", name=re.compile(r"download|document|file|xlsx|excel|csv|pdf", re.I)),
-        row.get_by_role("link", name=re.compile(r"download|document|file|xlsx|excel|csv|pdf", re.I)),
-        row.locator("a[download]"),
-        row.locator("button:has(svg), a:has(svg)"),
-    ]
-    for c in candidates:
+# --- Optional report-ready signal from the app's status endpoint -----------
+# Set REPORT_STATUS_URL to a fragment of the status XHR's URL (find it once with
+# BOT_DEBUG=1 and the trace's network tab); the event fires when a 2xx response
+# from it contains REPORT_STATUS_DONE.
+def watch_report_status(page: Page) -> Optional[asyncio.Event]:
+    if not CFG.report_status_url:
+        return None
+    done = asyncio.Event()
+
+    async def on_response(resp):
+        if done.is_set() or CFG.report_status_url not in resp.url or not resp.ok:
+            return
         try:
-            await c.wait_for(state="visible", timeout=500)
-            return c
+            if CFG.report_status_done.lower() in (await resp.text()).lower():
+                done.set()
         except Exception:
-            continue
-    return None
+            pass
+
+    page.on("response", on_response)
+    return done
+
+# --- Download button for our report (one combined locator) ------------------
+# Download-specific controls first; a bare icon button only counts in a row
+# with no visible download-specific one, so a view/delete icon placed earlier
+# in the row is never picked over the real download
+DOWNLOAD_BUTTONS = (
+    "a[download], "
+    "button[aria-label*='download' i], button[title*='download' i], "
+    "a[aria-label*='download' i], a[title*='download' i]"
+)
+DOWNLOAD_ICON_BUTTONS = "button:has(svg), a:has(svg)"
+
+def find_download_button(ctx: Union[Page, Frame], title: str) -> Locator:
+    def specific(scope) -> Locator:
+        return scope.locator(DOWNLOAD_BUTTONS).or_(scope.locator("button, a").filter(has_text=_RE_DL_WORDS))
+
+    row = ctx.locator(f":is(tr, [role='row']):has-text({json.dumps(title)})").first
+    icons = row.filter(has_not=specific(ctx).filter(visible=True)).locator(DOWNLOAD_ICON_BUTTONS)
+    return specific(row).or_(icons).filter(visible=True).first
 
 # =============================== Core logic =================================
-async def run_automation():
-    if not USERNAME or not PASSWORD:
+LOGIN_USER_FIELDS = "input[name='username'], input#username, input[autocomplete='username']"
+LOGIN_PASS_FIELDS = "input[name='password'], input#password, input[autocomplete='current-password']"
+
+async def launch_context(pw: Playwright) -> BrowserContext:
+    # REUSE_SESSION=false gets a throwaway profile: clearing cookies alone
+    # would leave a token in the old profile's localStorage
+    context = await pw.chromium.launch_persistent_context(
+        user_data_dir=str(PROFILE_DIR) if CFG.reuse_session else "",
+        headless=True,
+        accept_downloads=True,
+        args=CHROMIUM_ARGS,
+    )
+    if CFG.debug:
+        await context.tracing.start(screenshots=True, snapshots=True)
+    return context
+
+async def save_trace(context: BrowserContext):
+    if not CFG.debug:
+        return
+    path = DOWNLOAD_DIR / f"trace_{datetime.now(IST):%Y%m%d_%H%M%S}.zip"
+    try:
+        await context.tracing.stop(path=str(path))
+        print(f"[DEBUG] Saved trace: {path} (open with `playwright show-trace`)")
+    except Exception as e:
+        print(f"[DEBUG] Failed to save trace: {e}")
+
+async def download_report(context: BrowserContext) -> Path:
+    # Reuse a saved session if it's fresh enough (cookies normally survive
+    # in the profile; re-adding them covers a wiped or new profile)
+    session_fresh = CFG.reuse_session and auth_state_fresh()
+    if session_fresh:
+        try:
+            saved = json.loads(AUTH_STATE_PATH.read_text())
+            await context.add_cookies(saved.get("cookies", []))
+        except Exception as e:
+            print(f"[DEBUG] Could not load session state: {e}")
+    page = context.pages[0] if context.pages else await context.new_page()
+
+    logged_in = False
+    if session_fresh:
+        try:
+            await page.goto(CFG.reports_url, wait_until="domcontentloaded")
+            logged_in = await is_logged_in(page)
+        except Exception:
+            logged_in = False
+        print(f"[DEBUG] Saved session {'reused' if logged_in else 'expired; logging in'}.")
+
+    # 1) LOGIN
+    if not logged_in:
+        await page.goto(CFG.login_url, wait_until="domcontentloaded")
+        # Whichever renders first: the login form, or the app itself when the
+        # profile's cookies still authenticate (login URL redirects in)
+        try:
+            await page.locator(LOGIN_USER_FIELDS).or_(page.locator("#reportLeftMenu")).first.wait_for(
+                state="visible", timeout=10_000)
+        except PWTimeoutError:
+            pass  # fall through to the selector probes below
+        logged_in = await page.locator("#reportLeftMenu").is_visible()
+        if logged_in:
+            print("[DEBUG] Already logged in; skipping the login form.")
+
+    if not logged_in:
+        filled = False
+        try:
+            await page.locator(LOGIN_USER_FIELDS).first.fill(CFG.username, timeout=5000)
+            await page.locator(LOGIN_PASS_FIELDS).first.fill(CFG.password, timeout=5000)
+            filled = True
+        except Exception:
+            pass
+        if not filled:
+            # Placeholder-based fallback
+            try:
+                await page.get_by_placeholder(_RE_USER).first.fill(CFG.username, timeout=2500)
+                await page.get_by_placeholder(_RE_PASS).first.fill(CFG.password, timeout=2500)
+                filled = True
+            except Exception:
+                pass
+        async with step(page, "login_fields"):
+            if not filled:
+                raise RuntimeError("Could not find login fields.")
+
+        if not await try_click(page.get_by_role("button", name=_RE_LOGIN), 3000):
+            await page.locator("button[type='submit'], input[type='submit']").first.click()
+        if not await is_logged_in(page, 15_000):
+            print("[WARN] Sidebar not visible after login; continuing anyway.")
+        elif CFG.reuse_session:
+            # Persist the session for the next run
+            try:
+                await context.storage_state(path=str(AUTH_STATE_PATH))
+                print(f"[DEBUG] Saved session state: {AUTH_STATE_PATH}")
+            except Exception as e:
+                print(f"[DEBUG] Failed to save session state: {e}")
+
+    # 2) REPORTS
+    await open_reports(page)
+
+    hints = load_hints()
+
+    # 3) SELECT REPORT (page and frames raced on verified strategies; first
+    # frame that selects wins). Blind fallbacks only run after all of them
+    # failed, one frame at a time, so they can't pre-empt or disturb a
+    # slower frame's open panel.
+    async def select_in(ctx: Union[Page, Frame]) -> Optional[Union[Page, Frame]]:
+        return ctx if await select_report(ctx, CFG.report_title, hints=hints, fallbacks=False) else None
+
+    picked_ctx = await first_success([lambda c=c: select_in(c) for c in contexts(page)], stagger=0)
+    if picked_ctx is None:
+        for c in contexts(page):
+            if await select_report_fallback(c, CFG.report_title, hints=hints):
+                picked_ctx = c
+                break
+    async with step(page, "report_select_failed"):
+        if picked_ctx is None:
+            raise RuntimeError(f"Could not select report '{CFG.report_title}'.")
+
+    # 4) AS ON DATE = yesterday
+    await set_as_on_date(picked_ctx, YESTERDAY, hints)
+
+    # 5) EXECUTE (status listener goes up first so no response is missed)
+    status_done = watch_report_status(page)
+    await click_execute(picked_ctx, hints)
+
+    # 6) REPORT EXECUTIONS -> wait for download icon
+    await open_report_executions(picked_ctx)
+    btn = find_download_button(picked_ctx, CFG.report_title)
+
+    async def icon_visible() -> bool:
+        await btn.wait_for(state="visible", timeout=90_000)
+        return True
+
+    # Server says it's done: reopen the tab in case the list doesn't auto-refresh
+    async def status_then_refresh() -> bool:
+        await status_done.wait()
+        print("[DEBUG] Report status endpoint reported completion.")
+        await open_report_executions(picked_ctx)
+        await btn.wait_for(state="visible", timeout=15_000)
+        return True
+
+    waits = [icon_visible] + ([status_then_refresh] if status_done else [])
+    async with step(picked_ctx, "download_not_found"):
+        if not await first_success(waits, stagger=0, timeout=95):
+            raise RuntimeError("Download icon did not appear in Report Executions.")
+
+    # 7) DOWNLOAD
+    async with page.expect_download(timeout=60_000) as dl_info:
+        await btn.click()
+    download = await dl_info.value
+    file_path = DOWNLOAD_DIR / (download.suggested_filename or DEFAULT_FILENAME)
+    await download.save_as(str(file_path))
+    print(f"[OK] Downloaded: {file_path}")
+    save_hints(hints)
+    return file_path
+
+async def run_automation(pw: Optional[Playwright] = None) -> Path:
+    if not CFG.username or not CFG.password:
         raise RuntimeError("Missing WEBSITE_USER or WEBSITE_PASS.")
-    if not (isinstance(LOGIN_URL, str) and LOGIN_URL.startswith("http")):
+    if not (isinstance(CFG.login_url, str) and CFG.login_url.startswith("http")):
         raise RuntimeError("LOGIN_URL is invalid or empty.")
+    set_report_dates()
+
+    email_task: Optional[asyncio.Task] = None
 
+    async def fetch(pw: Playwright) -> Path:
+        nonlocal email_task
+        context = await launch_context(pw)
+        try:
+            file_path = await download_report(context)
+            # Start the SMTP send in a worker thread so it overlaps browser teardown
+            if email_config_ok():
+                email_task = asyncio.create_task(asyncio.to_thread(email_files, [[file_path]]))
+            return file_path
+        finally:
+            await flush_screenshots()
+            await save_trace(context)
+            await context.close()  # nothing after the download needs the browser
+
+    if pw is None:
+        async with async_playwright() as pw:
+            file_path = await fetch(pw)
+    else:
+        file_path = await fetch(pw)
+
+    if email_task is not None:
+        await email_task
+    return file_path
+
+# Long-lived driver: start Playwright once and reuse it for every run
+async def main_loop(interval_s: float):
     async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        context = await browser.new_context(accept_downl
+        while True:
+            try:
+                await run_automation(pw)
+            except Exception as e:
+                print(f"[ERROR] Run failed: {e}")
+            await asyncio.sleep(interval_s)
+
+if __name__ == "__main__":
+    if CFG.loop_interval_hours > 0:
+        asyncio.run(main_loop(CFG.loop_interval_hours * 3600))
+    else:
+        asyncio.run(run_automation())